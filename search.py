@@ -1,8 +1,28 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 
 base = "https://www.sefaria.org.il"
+# number of searches in flight at once
+SEARCH_WORKERS = 8
+# seconds to wait on connect/read; a stalled request times out and is retried
+# instead of holding a worker forever
+REQUEST_TIMEOUT = 10
+# one session for all calls so the TCP/TLS connection to sefaria is reused,
+# with a connection per worker and retries on timeouts and transient server errors
+# (searches are POSTs but read-only, so they are safe to retry too)
+session = requests.Session()
+session.mount("https://", HTTPAdapter(
+    pool_maxsize=SEARCH_WORKERS,
+    max_retries=Retry(total=3, backoff_factor=0.3,
+                      status_forcelist=(429, 500, 502, 503, 504), allowed_methods=None,
+                      # use our own short backoff; a server Retry-After could park a worker for as long as it says
+                      respect_retry_after_header=False),
+))
+
 def search(s):
     url = base + "/api/search-wrapper"
     params = { 
@@ -12,7 +32,7 @@ def search(s):
 
     }
 
-    r = requests.post(url, json=params)
+    r = session.post(url, json=params, timeout=REQUEST_TIMEOUT)
     r = r.json()
     return r
 
@@ -67,30 +87,29 @@ def search_v1(s):
         }
     }
 
-    df = pd.DataFrame(columns=["s", "highlight", "text_url"])
+    rows = []
     
     while True:
-        r = requests.post(url, json=q)
+        r = session.post(url, json=q, timeout=REQUEST_TIMEOUT)
         r = r.json()
         hits = r["hits"]["hits"]
-        # data frame with columns: s, highlight, text_url
+        # rows of (s, highlight, text_url), turned into a data frame once at the end
         for h in hits:
             ref = h["_source"]['ref']
             #replase space with underscore
             text_url = base + '/' + ref.replace(" ", "_") + "?lang=he"
             highlight = h["highlight"]["exact"][0]
-            df_tmp = pd.DataFrame({"s":[s], "highlight":[highlight], "text_url":[text_url]})
-            df = pd.concat([df, df_tmp], ignore_index=True)
+            rows.append((s, highlight, text_url))
         pos += 1000
         q["from"] = pos
         if len(hits) < 1000:
             break
 
-    return df
+    return pd.DataFrame(rows, columns=["s", "highlight", "text_url"])
 
 def get_text(ref):
     url = base + "/api/texts/" + ref
-    r = requests.get(url)
+    r = session.get(url, timeout=REQUEST_TIMEOUT)
     r = r.json()
     return r
 
@@ -98,19 +117,23 @@ def end_letters_errors():
     end_letters = ["ך", "ם", "ן", "ף", "ץ"]
     reg_letters = "אבגדהוזחטיכלמנסעפצקרשת"
 
-    df = pd.DataFrame(columns=["s", "highlight", "text_url"])
+    queries = [letter + reg_letter for letter in end_letters for reg_letter in reg_letters]
 
-    for letter in end_letters:
-        for reg_letter in reg_letters:
+    frames = []
 
-            s =  letter + reg_letter
-            r = search_v1(s)
-            # append r to datafarme
+    # the searches are independent, so run them concurrently; map keeps the query order.
+    # all workers share the module-level session. requests doesn't promise Session is
+    # thread safe, but we only send plain post/get calls through it (no headers or
+    # adapters changed after setup); its cookie jar is lock-protected and its urllib3
+    # connection pool is thread safe
+    with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as executor:
+        for s, r in zip(queries, executor.map(search_v1, queries)):
             l = len(r)
             print(f'search for {s} returned {l} results')
-            df = pd.concat([df, r], ignore_index=True)
+            frames.append(r)
 
-    return df
+    # one concat at the end instead of copying the growing frame per query
+    return pd.concat(frames, ignore_index=True)
             
 
 